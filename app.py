@@ -1,8 +1,10 @@
 import streamlit as st
-from google.cloud import texttospeech
-from io import BytesIO
-from gtts import gTTS
+import hashlib
 import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 st.title("🌐 Text to Speech Converter (Filipino + English)")
 st.write("Convert text into natural voices online!")
@@ -14,68 +16,259 @@ st.write("Convert text into natural voices online!")
 # credentials = <paste the JSON key here>
 if "GOOGLE_APPLICATION_CREDENTIALS" not in os.environ and "google" in st.secrets:
     creds_file = "/tmp/google_key.json"
-    with open(creds_file, "w") as f:
-        f.write(st.secrets["google"]["credentials"])
+    creds = st.secrets["google"]["credentials"].encode()
+    if (
+        not os.path.exists(creds_file)
+        or hashlib.sha256(open(creds_file, "rb").read()).digest() != hashlib.sha256(creds).digest()
+    ):
+        with open(creds_file, "wb") as f:
+            f.write(creds)
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = creds_file
 
-# ---- Voice Selection ----
-voice_choice = st.selectbox(
-    "Choose a voice:",
-    [
-        "Filipino (Default)",
-        "English - Male (John)",
-        "English - Male (Matthew)",
-        "English - Female (Joanna)",
-        "English - Female (Aria)",
-    ],
-)
-
-# ---- Text Input ----
-text = st.text_area("Enter your text:", "")
-
-# ---- Convert Button ----
-if st.button("Convert to Speech"):
+# ---- ON-DISK TTS CACHE ----
+# Synthesized MP3s are cached under the system temp dir, keyed by a hash of
+# (voice, text), so converting the same text again skips the TTS service.
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "tts_cache")
+CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.mp3")
+
+
+def _evict_lru():
+    """Remove least-recently-used cache files until the cache fits the budget."""
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+        total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# Google Cloud TTS rejects inputs over 5000 bytes, and long texts synthesize
+# serially anyway; chunks are synthesized in parallel and concatenated.
+CHUNK_CHARS = 3000
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Single source of truth for every offered voice: the selectbox options and
+# the engine dispatch in _synth_one both derive from this table.
+VOICES = {
+    "Filipino (Default)": {"engine": "gtts", "lang": "tl"},
+    "English - Male (John)": {"engine": "google", "name": "en-US-JohnNeural"},
+    "English - Male (Matthew)": {"engine": "google", "name": "en-US-Standard-B"},
+    "English - Female (Joanna)": {"engine": "google", "name": "en-US-Standard-A"},
+    "English - Female (Aria)": {"engine": "google", "name": "en-US-Neural2-C"},
+}
+
+
+def _split_text(text):
+    """Split text on sentence boundaries into chunks of at most CHUNK_CHARS."""
+    sentences = _SENTENCE_RE.split(text)
+    chunks = []
+    current = ""
+    for sentence in sentences:
+        if current and len(current) + len(sentence) + 1 > CHUNK_CHARS:
+            chunks.append(current)
+            current = sentence
+        elif current:
+            current = f"{current} {sentence}"
+        else:
+            current = sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _synth_gtts(text, lang):
+    from gtts import gTTS  # deferred: only needed once a conversion runs
+
+    tts = gTTS(text, lang=lang)
+    return b"".join(tts.stream())
+
+
+@st.cache_resource
+def _google_client():
+    from google.cloud import texttospeech  # deferred: grpc/proto imports are slow
+
+    return texttospeech.TextToSpeechClient()
+
+
+def _synth_google(text, voice_name):
+    from google.cloud import texttospeech
+
+    client = _google_client()
+
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    voice = texttospeech.VoiceSelectionParams(
+        language_code="en-US",
+        name=voice_name,
+    )
+    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+
+    response = client.synthesize_speech(
+        input=synthesis_input,
+        voice=voice,
+        audio_config=audio_config,
+    )
+    return response.audio_content
+
+
+# ---- SHARED S3 CACHE (optional) ----
+# The on-disk cache dies with the container on Streamlit Cloud; mirroring
+# entries to an S3 bucket makes hits survive restarts and shares them across
+# replicas. Enable in secrets:
+# [aws]
+# bucket = <bucket name>
+# access_key_id = ...
+# secret_access_key = ...
+# region = ...
+@st.cache_resource
+def _s3_cache():
+    """Return (client, bucket) for the shared cache, or None when unconfigured."""
+    if "aws" not in st.secrets:
+        return None
+    try:
+        import boto3
+    except ImportError:
+        return None
+    aws = st.secrets["aws"]
+    client = boto3.client(
+        "s3",
+        region_name=aws.get("region"),
+        aws_access_key_id=aws.get("access_key_id"),
+        aws_secret_access_key=aws.get("secret_access_key"),
+    )
+    return client, aws["bucket"]
+
+
+def _s3_get(key):
+    cache = _s3_cache()
+    if cache is None:
+        return None
+    client, bucket = cache
+    try:
+        return client.get_object(Bucket=bucket, Key=f"tts/{key}.mp3")["Body"].read()
+    except Exception:
+        return None
+
+
+def _s3_put(key, data):
+    cache = _s3_cache()
+    if cache is None:
+        return
+    client, bucket = cache
+    try:
+        client.put_object(Bucket=bucket, Key=f"tts/{key}.mp3", Body=data)
+    except Exception:
+        pass  # the shared cache is best-effort; synthesis already succeeded
+
+
+def _strip_id3(part):
+    """Drop a leading ID3v2 tag so a concatenated part contributes only MP3 frames."""
+    if part[:3] == b"ID3" and len(part) > 10:
+        size = (
+            (part[6] & 0x7F) << 21
+            | (part[7] & 0x7F) << 14
+            | (part[8] & 0x7F) << 7
+            | (part[9] & 0x7F)
+        )
+        return part[10 + size:]
+    return part
+
+
+def _synth_one(chunk, voice_choice):
+    voice = VOICES[voice_choice]
+    if voice["engine"] == "gtts":
+        return _synth_gtts(chunk, voice["lang"])
+    return _synth_google(chunk, voice["name"])
+
+
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def synthesize(text, voice_choice):
+    """Return MP3 bytes for (text, voice), reusing the on-disk cache when possible."""
+    key = hashlib.sha256(f"{voice_choice}|{text}".encode()).hexdigest()
+    path = _cache_path(key)
+    if os.path.exists(path):
+        os.utime(path)  # keep frequently used entries out of LRU eviction
+        with open(path, "rb") as f:
+            return f.read()
+
+    data = _s3_get(key)
+    if data is None:
+        chunks = _split_text(text)
+        if len(chunks) == 1:
+            data = _synth_one(chunks[0], voice_choice)
+        else:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                parts = list(pool.map(lambda chunk: _synth_one(chunk, voice_choice), chunks))
+            data = parts[0] + b"".join(_strip_id3(part) for part in parts[1:])
+        _s3_put(key, data)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _evict_lru()
+    return data
+
+
+@st.cache_resource
+def _prewarm():
+    """Build the Google TTS client in the background so the page paints first.
+
+    By the time the user has typed text and clicked Convert, the grpc import
+    and client setup from _google_client have usually already happened here
+    instead of on the click.
+    """
+
+    def warm():
+        try:
+            _google_client()
+        except Exception:
+            pass  # no credentials configured; the Convert path reports errors
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+_prewarm()
+
+# ---- Input Form ----
+# A form batches widget changes into a single rerun: switching voices or
+# editing text does nothing until Convert is pressed.
+with st.form("tts_form"):
+    voice_choice = st.selectbox("Choose a voice:", list(VOICES))
+    text = st.text_area("Enter your text:", "")
+    submitted = st.form_submit_button("Convert to Speech")
+
+if submitted:
     if text.strip() == "":
         st.warning("⚠️ Please enter some text first.")
     else:
-        audio_bytes = BytesIO()
+        audio_data = b""
+        try:
+            audio_data = synthesize(text, voice_choice)
+        except Exception as e:
+            st.error(f"TTS Error: {e}")
 
-        if voice_choice == "Filipino (Default)":
-            # Use gTTS for Filipino
-            tts = gTTS(text, lang="tl")
-            tts.write_to_fp(audio_bytes)
-            audio_bytes.seek(0)
-        else:
-            # Use Google Cloud TTS for English
-            voice_map = {
-                "English - Male (John)": "en-US-JohnNeural",
-                "English - Male (Matthew)": "en-US-Standard-B",
-                "English - Female (Joanna)": "en-US-Standard-A",
-                "English - Female (Aria)": "en-US-Neural2-C",
-            }
-
-            voice_name = voice_map[voice_choice]
-            client = texttospeech.TextToSpeechClient()
-
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="en-US",
-                name=voice_name,
-            )
-            audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-
-            try:
-                response = client.synthesize_speech(
-                    input=synthesis_input,
-                    voice=voice,
-                    audio_config=audio_config,
-                )
-                audio_bytes.write(response.audio_content)
-                audio_bytes.seek(0)
-            except Exception as e:
-                st.error(f"Google TTS Error: {e}")
-
-        if audio_bytes.getbuffer().nbytes > 0:
+        if audio_data:
             st.success("✅ Speech generated successfully!")
-            st.audio(audio_bytes, format="audio/mp3")
-            st.download_button("Download MP3", audio_bytes, file_name="speech.mp3")
+            st.audio(audio_data, format="audio/mp3")
+            st.download_button("Download MP3", audio_data, file_name="speech.mp3")